@@ -5,6 +5,9 @@ from typing import TYPE_CHECKING, Any
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+# Set once register_grep_accessor() has run so repeated calls are a no-op
+_REGISTERED = False
+
 
 class GrepAccessor:
     """Accessor class that provides .grep() method to dataframes."""
@@ -90,23 +93,28 @@ def register_grep_accessor() -> None:
        col
     0  foo
     """
+    global _REGISTERED  # noqa: PLW0603
+    if _REGISTERED:
+        return
+
     # Try to register for pandas
     try:
         import pandas as pd
-
+    except ImportError:
+        pass
+    else:
         if not hasattr(pd.DataFrame, "grep"):
 
             @pd.api.extensions.register_dataframe_accessor("grep")
             class PandasGrepAccessor(GrepAccessor):
                 pass
 
-    except ImportError:
-        pass
-
     # Try to register for polars
     try:
         import polars as pl
-
+    except ImportError:
+        pass
+    else:
         if not hasattr(pl.DataFrame, "grep"):
 
             @pl.api.register_dataframe_namespace("grep")
@@ -119,6 +127,4 @@ def register_grep_accessor() -> None:
             class PolarsLazyGrepAccessor(GrepAccessor):
                 pass
 
-    except (ImportError, AttributeError):
-        # polars.api might not exist in older versions
-        pass
+    _REGISTERED = True
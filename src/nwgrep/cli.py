@@ -1,22 +1,50 @@
 from __future__ import annotations
 
 import argparse
-import io
+import glob
+import importlib.util
 import sys
+from functools import cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from nwgrep.core import nwgrep
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from types import ModuleType
+
     import polars as pl
+    from polars._typing import ParallelStrategy
+
+# Only probe for polars here; importing it is deferred until a search actually
+# runs so that --help and argument errors don't pay for loading the extension.
+HAS_POLARS = importlib.util.find_spec("polars") is not None
+
 
-try:
+@cache
+def _pl() -> ModuleType:
+    """Import polars on first use."""
     import polars as pl
 
-    HAS_POLARS = True
-except ImportError:
-    HAS_POLARS = False
+    return pl
+
+
+def _parse_columns(value: str) -> tuple[str, ...]:
+    """Parse the comma-separated --columns value, ignoring surrounding whitespace."""
+    return tuple(col.strip() for col in value.split(",") if col.strip())
+
+
+def _positive_int(value: str) -> int:
+    """Parse a row count, rejecting zero and negatives with a usage error."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        msg = f"must be a positive integer, got {value!r}"
+        raise argparse.ArgumentTypeError(msg)
+    return number
 
 
 def _create_parser() -> argparse.ArgumentParser:
@@ -33,16 +61,23 @@ Examples:
   nwgrep -i "warning" data.feather
   nwgrep -v "success" data.ipc
   nwgrep -E "err(or|!)?" data.parquet
+  nwgrep -l "error" logs/*.parquet
   nwgrep --columns name,email "alice" data.parquet --format ndjson
         """,
     )
     parser.add_argument("pattern", help="Search pattern")
     parser.add_argument(
-        "file", help="Binary dataframe file to search (Parquet, Feather, IPC)"
+        "file",
+        nargs="+",
+        help=(
+            "Binary dataframe file(s) to search (Parquet, Feather, IPC). "
+            "Glob patterns are expanded"
+        ),
     )
     parser.add_argument(
         "-c",
         "--columns",
+        type=_parse_columns,
         help="Comma-separated list of columns to search",
         default=None,
     )
@@ -73,7 +108,7 @@ Examples:
     parser.add_argument(
         "-n",
         "--max-rows",
-        type=int,
+        type=_positive_int,
         default=None,
         help="Maximum number of rows to display",
     )
@@ -94,9 +129,31 @@ Examples:
         default="table",
         help="Output format (default: table)",
     )
+    parser.add_argument(
+        "--parallel",
+        choices=["auto", "columns", "row_groups", "prefiltered", "none"],
+        default="auto",
+        help=(
+            "Parquet read parallelism strategy, passed to polars (default: auto). "
+            "Try row_groups or columns if auto picks poorly for a file's layout"
+        ),
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["streaming", "in-memory", "gpu"],
+        default="streaming",
+        help=(
+            "Polars engine used to run the search (default: streaming). "
+            "gpu requires the cudf-polars package and a CUDA device"
+        ),
+    )
     return parser
 
 
+# Built once at import and reused by every main() call
+_PARSER = _create_parser()
+
+
 def _check_polars() -> None:
     """Check that polars is installed, exit with helpful message if not."""
     if not HAS_POLARS:
@@ -109,29 +166,98 @@ def _check_polars() -> None:
         sys.exit(1)
 
 
-def _load_file(file_path: Path) -> pl.LazyFrame:
-    """Load a binary dataframe file using polars lazy scanning."""
-    if not file_path.exists():
-        print(f"Error: File '{file_path}' not found", file=sys.stderr)
-        sys.exit(1)
-
-    suffix = file_path.suffix.lower()
+def _scan_parquet(paths: list[Path], parallel: ParallelStrategy) -> pl.LazyFrame:
+    return _pl().scan_parquet(paths, parallel=parallel)
+
+
+def _scan_ipc(paths: list[Path], parallel: ParallelStrategy) -> pl.LazyFrame:  # noqa: ARG001
+    # IPC has no parallel strategy to pick; the argument is parquet-only
+    return _pl().scan_ipc(paths)
+
+
+# Lazy scanners keyed by lowercased file suffix. Each takes every file of its
+# format at once so polars can read them in parallel as a single scan.
+_LOADERS: dict[str, Callable[[list[Path], ParallelStrategy], pl.LazyFrame]] = {
+    ".parquet": _scan_parquet,
+    ".feather": _scan_ipc,
+    ".arrow": _scan_ipc,
+    ".ipc": _scan_ipc,
+}
+
+
+def _expand_paths(files: list[str]) -> list[Path]:
+    """Expand glob patterns in the file arguments, keeping the given order."""
+    paths: list[Path] = []
+    for file in files:
+        # Patterns the shell didn't expand (quoted, or on Windows) are globbed
+        # here; plain paths are kept as-is so a missing file is reported below.
+        # glob.glob rather than Path.glob, which rejects absolute patterns.
+        is_glob = any(char in file for char in "*?[")
+        matches = sorted(glob.glob(file)) if is_glob else [file]  # noqa: PTH207
+        if not matches:
+            print(f"Error: No files match '{file}'", file=sys.stderr)
+            sys.exit(1)
+        paths.extend(Path(match) for match in matches)
+    return paths
+
+
+def _file_schema(
+    loader: Callable[[list[Path], ParallelStrategy], pl.LazyFrame],
+    file_path: Path,
+    parallel: ParallelStrategy,
+) -> tuple[tuple[str, pl.DataType], ...]:
+    """Read one file's column names and dtypes (metadata only, no data)."""
+    return tuple(loader([file_path], parallel).collect_schema().items())
+
+
+def _load_files(
+    file_paths: list[Path], parallel: ParallelStrategy = "auto"
+) -> pl.LazyFrame:
+    """Load binary dataframe files as one frame using polars lazy scanning."""
+    loaders = []
+    for file_path in file_paths:
+        if not file_path.exists():
+            print(f"Error: File '{file_path}' not found", file=sys.stderr)
+            sys.exit(1)
+
+        suffix = file_path.suffix.lower()
+        loader = _LOADERS.get(suffix)
+        if loader is None:
+            print(
+                f"Error: Unsupported or non-binary file type '{suffix}'.\n"
+                "nwgrep CLI supports: .parquet, .feather, .arrow, .ipc\n"
+                "For text files (CSV, TSV, TXT), use standard 'grep' or 'ripgrep'.",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        loaders.append(loader)
+
+    # Group runs of consecutive files so each run becomes one multi-file scan
+    # and rows keep the order of the files. A scan takes its schema from its
+    # first file, so a run shares the schema as well as the scanner; a lone
+    # file needs no schema read.
+    groups: list[tuple[tuple[object, ...], list[Path]]] = []
     try:
-        if suffix == ".parquet":
-            return pl.scan_parquet(file_path)
-        if suffix in {".feather", ".arrow", ".ipc"}:
-            return pl.scan_ipc(file_path)
-
-        print(
-            f"Error: Unsupported or non-binary file type '{suffix}'.\n"
-            "nwgrep CLI supports: .parquet, .feather, .arrow, .ipc\n"
-            "For text files (CSV, TSV, TXT), use standard 'grep' or 'ripgrep'.",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+        for file_path, loader in zip(file_paths, loaders, strict=True):
+            key = (
+                loader,
+                _file_schema(loader, file_path, parallel)
+                if len(file_paths) > 1
+                else (),
+            )
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append(file_path)
+            else:
+                groups.append((key, [file_path]))
+        frames = [loader(paths, parallel) for (loader, _), paths in groups]
     except OSError as e:
         print(f"Error reading file: {e}", file=sys.stderr)
         sys.exit(1)
+    if len(frames) == 1:
+        return frames[0]
+    # Stack the groups by column name: a column missing from some files is
+    # null there, and differing dtypes are cast to a common supertype
+    return _pl().concat(frames, how="diagonal_relaxed")
 
 
 def _validate_flags(args: argparse.Namespace) -> bool:
@@ -152,6 +278,16 @@ def _validate_flags(args: argparse.Namespace) -> bool:
     if args.fixed_strings and args.regex:
         print("Warning: -F/--fixed-strings overrides -E/--regex flag", file=sys.stderr)
 
+    # The GPU engine lives in a separate package; fail early rather than at
+    # collect time with a polars import error
+    if args.engine == "gpu" and importlib.util.find_spec("cudf_polars") is None:
+        print(
+            "Error: --engine gpu requires cudf-polars. See "
+            "https://docs.pola.rs/user-guide/gpu-support/ for installation",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
     # Determine final regex mode based on priority: -F > -w > -E > default
     if args.fixed_strings:
         return False  # Force literal
@@ -160,48 +296,82 @@ def _validate_flags(args: argparse.Namespace) -> bool:
     return args.regex  # Use -E flag
 
 
+def _write_csv(df: pl.DataFrame, separator: str = ",") -> None:
+    """Write CSV straight to the binary stdout buffer (no intermediate str)."""
+    sys.stdout.flush()
+    df.write_csv(sys.stdout.buffer, separator=separator)
+    sys.stdout.buffer.flush()
+
+
+def _write_ndjson(df: pl.DataFrame) -> None:
+    """Stream NDJSON straight to the binary stdout buffer (no intermediate copy)."""
+    sys.stdout.flush()
+    df.write_ndjson(sys.stdout.buffer)
+    sys.stdout.buffer.flush()
+
+
+# Writers for eager output, keyed by --format
+_WRITERS: dict[str, Callable[[pl.DataFrame], object]] = {
+    "csv": _write_csv,
+    "tsv": lambda df: _write_csv(df, separator="\t"),
+    "ndjson": _write_ndjson,
+    "table": print,
+}
+
+# Streaming sinks for LazyFrame output, keyed by --format. The table format
+# has no sink because it needs the collected frame to render.
+_SINKS: dict[str, Callable[[pl.LazyFrame], object]] = {
+    "csv": lambda lf: lf.sink_csv(sys.stdout.buffer),
+    "tsv": lambda lf: lf.sink_csv(sys.stdout.buffer, separator="\t"),
+    "ndjson": lambda lf: lf.sink_ndjson(sys.stdout.buffer),
+}
+
+
+def _collect(
+    result: pl.LazyFrame | pl.DataFrame, args: argparse.Namespace
+) -> pl.DataFrame:
+    """Collect a lazy result with the engine chosen by --engine."""
+    pl = _pl()
+    return (
+        result.collect(engine=args.engine)
+        if isinstance(result, pl.LazyFrame)
+        else result
+    )
+
+
 def _output_dataframe(df: pl.DataFrame, args: argparse.Namespace) -> None:
     """Output a dataframe in the requested format."""
-    if args.format == "csv":
-        print(df.write_csv())
-    elif args.format == "tsv":
-        print(df.write_csv(separator="\t"))
-    elif args.format == "ndjson":
-        buf = io.BytesIO()
-        df.write_ndjson(buf)
-        print(buf.getvalue().decode("utf-8").strip())
-    else:  # table
-        print(df)
+    _WRITERS[args.format](df)
 
 
 def _output_files_with_matches(
     result: pl.LazyFrame | pl.DataFrame, args: argparse.Namespace, file_path: Path
 ) -> None:
     """Handle files-with-matches output (-l flag)."""
+    pl = _pl()
     if args.format != "table":
         print(
             "Warning: --format ignored when using -l/--files-with-matches",
             file=sys.stderr,
         )
-    # Check if there are any matches (short-circuit on first match)
-    has_matches = (
-        result.limit(1).collect().height > 0
-        if isinstance(result, pl.LazyFrame)
-        else len(result) > 0
-    )
-    if has_matches:
+    # Check if there are any matches (short-circuit on first match). Projecting
+    # to a single column lets polars skip decoding the other output columns;
+    # a literal select can't be used here as it yields a row even with no match.
+    if _collect(result.select(pl.first()).limit(1), args).height > 0:
         print(file_path)
 
 
 def _output_results(
-    result: pl.LazyFrame | pl.DataFrame | int, args: argparse.Namespace, file_path: Path
+    result: pl.LazyFrame | pl.DataFrame, args: argparse.Namespace, file_path: Path
 ) -> None:
     """Handle printing or streaming the filtered results."""
-    # Handle count output (just print the integer)
-    if isinstance(result, int):
+    pl = _pl()
+    # Handle count output (just print the integer). Counted here rather than
+    # with nwgrep(count=True) so the query runs on the engine from --engine.
+    if args.count:
         if args.format != "table":
             print("Warning: --format ignored when using --count", file=sys.stderr)
-        print(result)
+        print(_collect(result.select(pl.len()), args).item())
         return
 
     # Handle files-with-matches output
@@ -209,57 +379,73 @@ def _output_results(
         _output_files_with_matches(result, args, file_path)
         return
 
-    # Handle NDJSON streaming for LazyFrame
+    # Limit rows if requested. On a LazyFrame this is pushed into the plan,
+    # so the scan stops once enough matching rows have been found.
+    if args.max_rows:
+        result = result.head(args.max_rows)
+
+    # With the streaming engine, sink LazyFrame results without collecting them
+    # into memory first. Other engines collect, then write.
+    sink = _SINKS.get(args.format)
     if (
-        args.format == "ndjson"
+        sink is not None
+        and args.engine == "streaming"
         and isinstance(result, pl.LazyFrame)
-        and not args.max_rows
     ):
-        result.sink_ndjson(sys.stdout)
+        sys.stdout.flush()
+        sink(result)
         return
 
-    # Collect if lazy
-    df: pl.DataFrame = result.collect() if isinstance(result, pl.LazyFrame) else result
-
-    # Limit rows if requested
-    if args.max_rows:
-        df = df.head(args.max_rows)
+    _output_dataframe(_collect(result, args), args)
+
+
+def _search(df: pl.LazyFrame, args: argparse.Namespace, *, regex: bool) -> pl.LazyFrame:
+    """Run nwgrep over a scanned frame with the options from the command line."""
+    # Use nwgrep with polars LazyFrame, get back a polars LazyFrame. --count is
+    # handled when the result is output, so it can use the chosen engine.
+    return nwgrep(
+        df,
+        args.pattern,
+        columns=args.columns,
+        case_sensitive=not args.ignore_case,
+        regex=regex,
+        invert=args.invert,
+        whole_word=args.whole_word,
+        exact=args.exact,
+    )
 
-    _output_dataframe(df, args)
 
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command-line interface for nwgrep.
 
-def main() -> None:
-    """Command-line interface for nwgrep."""
+    Parses ``argv`` (``sys.argv[1:]`` by default), so the CLI can also be run
+    in-process, e.g. from tests.
+    """
     _check_polars()
 
-    parser = _create_parser()
-    args = parser.parse_args()
+    args = _PARSER.parse_args(argv)
 
     # Validate flags and get final regex mode
     final_regex = _validate_flags(args)
 
-    file_path = Path(args.file)
-    df = _load_file(file_path)
-
-    columns = args.columns.split(",") if args.columns else None
+    file_paths = _expand_paths(args.file)
 
     try:
-        # Use nwgrep with polars LazyFrame, get back polars (or int if count)
-        # we ignore the overload here because: the count parameter from argparse has
-        # type bool (not narrowed to Literal[True] or Literal[False])
-        result = nwgrep(  # type: ignore[no-matching-overload]
-            df,
-            args.pattern,
-            columns=columns,
-            case_sensitive=not args.ignore_case,
-            regex=final_regex,
-            invert=args.invert,
-            whole_word=args.whole_word,
-            count=args.count,
-            exact=args.exact,
-        )
-        _output_results(result, args, file_path)
-    except (ValueError, RuntimeError, OSError) as e:
+        if args.files_with_matches and not args.count:
+            # -l reports each file on its own, so search them one at a time
+            for file_path in file_paths:
+                df = _load_files([file_path], args.parallel)
+                result = _search(df, args, regex=final_regex)
+                _output_results(result, args, file_path)
+        else:
+            # Otherwise all files are searched together as one scan
+            df = _load_files(file_paths, args.parallel)
+            result = _search(df, args, regex=final_regex)
+            _output_results(result, args, file_paths[0])
+    except (ValueError, RuntimeError, OSError, _pl().exceptions.PolarsError) as e:
+        # Polars errors (e.g. incompatible dtypes across files) can surface
+        # after output has started, so report them cleanly rather than with a
+        # traceback. The class is only looked up once an error is raised.
         print(f"Error during search: {e}", file=sys.stderr)
         sys.exit(1)
 
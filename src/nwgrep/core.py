@@ -1,134 +1,344 @@
 from __future__ import annotations
 
 import re
-from typing import TYPE_CHECKING, Literal, overload
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING, Any, Literal, overload
 
 import narwhals as nw
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Callable, Collection, Sequence
+    from types import ModuleType
 
     from great_tables import GT
     from narwhals.typing import FrameT
     from pandas.io.formats.style import Styler
 
-
-def _get_search_columns(df: nw.LazyFrame, columns: Sequence[str] | None) -> list[str]:
-    """Determine which columns to search."""
+# Regex constructs that can't be safely joined into one alternation: global
+# inline flags (Python's re only accepts them at the very start), named groups
+# (names must be unique) and backreferences (group numbers shift when joined)
+_UNFUSABLE_REGEX = re.compile(r"\(\?[a-zA-Z-]+\)|\(\?P?<(?![=!])|\(\?P=|\\\d")
+# Characters that give a regex meaning beyond its literal text
+_REGEX_META = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+# Dtypes searched by default. Checked with isinstance since parametrized dtypes
+# (Enum carries its categories) don't compare equal to their bare class.
+_STRING_DTYPES = (nw.String, nw.Categorical, nw.Enum)
+# Dictionary-encoded dtypes that polars' string functions reject, so they are
+# cast to String before matching
+_CAST_DTYPES = (nw.Categorical, nw.Enum)
+# Eager inputs smaller than this are searched eagerly: for a handful of rows,
+# building and optimizing a lazy plan costs more than the search itself
+_EAGER_MAX_ROWS = 10_000
+
+
+def _get_search_columns(
+    df: nw.LazyFrame | nw.DataFrame, columns: Sequence[str] | None
+) -> tuple[list[str], list[str]]:
+    """Determine which columns to search.
+
+    Returns the columns to search and the subset that must be cast to String.
+    """
     if columns:
-        return list(columns)
+        # Named columns are searched whatever their type, but dictionary-encoded
+        # ones still need the cast before string matching. Only the named
+        # columns' dtypes are resolved, not the whole frame's schema.
+        named = df.select(list(dict.fromkeys(columns))).collect_schema()
+        cast_cols = [c for c, dtype in named.items() if isinstance(dtype, _CAST_DTYPES)]
+        return list(columns), cast_cols
 
     schema = df.collect_schema()
 
     # Search all string-like columns
-    return [
+    search_cols = [
         col_name
         for col_name, dtype in schema.items()
-        if dtype in {nw.String, nw.Categorical}
+        if isinstance(dtype, _STRING_DTYPES)
+    ]
+    cast_cols = [
+        col_name
+        for col_name in search_cols
+        if isinstance(schema[col_name], _CAST_DTYPES)
     ]
+    return search_cols, cast_cols
 
 
-def _build_column_match(
-    expr: nw.Expr, pat: str, *, case_sensitive: bool, regex: bool, exact: bool
-) -> nw.Expr:
-    """Build a match expression for a single column and pattern.
+def _column_expr(col: str, cast_cols: Collection[str]) -> nw.Expr:
+    """Select a search column, casting dictionary-encoded columns to String."""
+    expr = nw.col(col)
+    return expr.cast(nw.String) if col in cast_cols else expr
+
 
-    Consolidates exact, regex, and literal matching with unified case-handling.
+@lru_cache(maxsize=256)
+def _whole_word_pattern(patterns: tuple[str, ...]) -> str:
+    r"""Escape literal patterns and wrap them in word boundaries.
+
+    Several words become one ``\b(?:w1|w2)\b`` regex, so each cell is scanned
+    once rather than once per word. Cached so repeated searches for the same
+    words (notebooks, loops) skip re-escaping them on every call.
+    """
+    if len(patterns) == 1:
+        return rf"\b{re.escape(patterns[0])}\b"
+    return rf"\b(?:{'|'.join(re.escape(pat) for pat in patterns)})\b"
+
+
+def _prepare_pattern(
+    pat: str, *, case_sensitive: bool, regex: bool, exact: bool
+) -> str:
+    """Turn a user pattern into the string handed to the backend.
+
+    This is the column-independent half of matching (anchoring, case folding,
+    escaping), so callers can do it once per pattern rather than per column.
     """
     # For regex mode, use regex flags for case-insensitivity instead of lowercasing
     # (lowercasing the pattern breaks character classes like [A-Z])
     if regex:
-        if exact:
-            # Wrap pattern with anchors for exact regex matching
-            anchored_pattern = f"^(?:{pat})$"
-            # Use (?i) flag for case-insensitive matching
-            final_pattern = (
-                anchored_pattern if case_sensitive else f"(?i){anchored_pattern}"
-            )
-            return expr.str.contains(final_pattern, literal=False)
-        # Regular regex matching
+        # Wrap pattern with anchors for exact regex matching
+        anchored_pattern = f"^(?:{pat})$" if exact else pat
         # Use (?i) flag for case-insensitive matching
-        final_pattern = pat if case_sensitive else f"(?i){pat}"
-        return expr.str.contains(final_pattern, literal=False)
+        return anchored_pattern if case_sensitive else f"(?i){anchored_pattern}"
+
+    if exact or case_sensitive:
+        # Exact fixed strings compare against a lowercased column when needed
+        return pat if case_sensitive else pat.lower()
+    # Escape the literal and use the (?i) flag so the engine folds case while
+    # scanning, instead of materializing a lowercased copy of the column
+    return f"(?i){re.escape(pat)}"
+
+
+def _match_equal(expr: nw.Expr, pat: str) -> nw.Expr:
+    return expr == pat
+
+
+def _match_equal_lowercase(expr: nw.Expr, pat: str) -> nw.Expr:
+    return expr.str.to_lowercase() == pat
 
-    # For non-regex (literal/exact fixed strings), normalize to lowercase
-    search_expr = expr if case_sensitive else expr.str.to_lowercase()
-    search_pat = pat if case_sensitive else pat.lower()
 
-    if exact:
+def _match_literal(expr: nw.Expr, pat: str) -> nw.Expr:
+    return expr.str.contains(pat, literal=True)
+
+
+def _match_regex(expr: nw.Expr, pat: str) -> nw.Expr:
+    return expr.str.contains(pat, literal=False)
+
+
+def _pick_matcher(
+    *, case_sensitive: bool, regex: bool, exact: bool
+) -> Callable[[nw.Expr, str], nw.Expr]:
+    """Pick how a column is matched against a pattern from _prepare_pattern.
+
+    The flags are resolved once per search, so building the expression for
+    every (pattern, column) pair doesn't re-branch on them.
+    """
+    if exact and not regex:
         # Use equality for exact fixed string matching
-        return search_expr == search_pat
-    # Literal string matching (default)
-    return search_expr.str.contains(search_pat, literal=True)
+        return _match_equal if case_sensitive else _match_equal_lowercase
+    # Regex, and case-insensitive literals (rewritten to (?i) regex), go through
+    # the regex engine; case-sensitive literals use plain substring search
+    return _match_literal if not regex and case_sensitive else _match_regex
+
+
+def _match_exact_literals(
+    expr: nw.Expr, pats: Sequence[str], *, case_sensitive: bool
+) -> nw.Expr:
+    """Match a column against several prepared exact fixed strings at once.
+
+    A single is_in is one hash lookup per row, rather than one equality
+    comparison per pattern.
+    """
+    search_expr = expr if case_sensitive else expr.str.to_lowercase()
+    return search_expr.is_in(pats)
+
+
+def _is_plain_regex(patterns: Sequence[str]) -> bool:
+    """Check whether regex patterns are really fixed strings.
+
+    A regex without metacharacters matches only its own text, so it can be
+    searched as a literal: a plain substring scan (or with ``exact``, an
+    equality check) instead of running the regex engine on every row.
+    """
+    return not any(_REGEX_META.search(pat) for pat in patterns)
+
+
+def _fuse_patterns(
+    patterns: list[str], *, regex: bool, exact: bool
+) -> tuple[list[str], bool]:
+    """Combine several patterns into a single regex alternation.
+
+    One alternation lets the backend scan each cell once instead of once per
+    pattern. Returns the (possibly fused) patterns and the resulting regex mode.
+    Exact fixed strings are left alone since they're matched by equality.
+    """
+    if len(patterns) < 2 or (exact and not regex):
+        return patterns, regex
+    if not regex:
+        return ["|".join(re.escape(pat) for pat in patterns)], True
+    if any(_UNFUSABLE_REGEX.search(pat) for pat in patterns):
+        return patterns, regex
+    return ["|".join(f"(?:{pat})" for pat in patterns)], regex
+
+
+def _or_all(exprs: list[nw.Expr]) -> nw.Expr:
+    """OR boolean expressions together, skipping the reduction for just one."""
+    if len(exprs) == 1:
+        return exprs[0]
+    return nw.any_horizontal(*exprs, ignore_nulls=True)
+
+
+def _prepare_patterns(
+    patterns: tuple[str, ...], *, case_sensitive: bool, regex: bool, exact: bool
+) -> tuple[tuple[str, ...], bool]:
+    """Fuse and prepare the user's patterns, returning them and the final regex mode.
+
+    This is all the column-independent string work (escaping, fusing into one
+    alternation, anchoring, case flags).
+    """
+    regex = regex and not _is_plain_regex(patterns)
+    fused, regex = _fuse_patterns(list(patterns), regex=regex, exact=exact)
+    flags = {"case_sensitive": case_sensitive, "regex": regex, "exact": exact}
+    return tuple(_prepare_pattern(pat, **flags) for pat in fused), regex
 
 
+@lru_cache(maxsize=256)
 def _build_match_expr(
-    search_cols: list[str],
-    patterns: list[str],
+    search_cols: tuple[str, ...],
+    patterns: tuple[str, ...],
     *,
     case_sensitive: bool,
     regex: bool,
     exact: bool,
+    cast_cols: frozenset[str] = frozenset(),
 ) -> nw.Expr:
-    """Build matching expression: any(pattern) matches any(column)."""
+    """Build matching expression: any(pattern) matches any(column).
+
+    Narwhals expressions are immutable and not tied to a frame, so the same
+    expression can be applied to any frame with these columns. Repeated
+    searches (notebook loops, dashboards) skip the pattern preparation and
+    rebuilding the expression tree; the least recently used of the 256 cached
+    expressions is evicted first. Arguments must be hashable for the cache.
+    """
+    prepared, regex = _prepare_patterns(
+        patterns, case_sensitive=case_sensitive, regex=regex, exact=exact
+    )
+
     # Flatten matching logic into a single list of candidate expressions.
     # Since we want to know if ANY pattern matches ANY column, a flat list
     # of all combinations combined with OR is mathematically equivalent
     # to the nested OR logic.
-    exprs = [
-        _build_column_match(
-            nw.col(col), pat, case_sensitive=case_sensitive, regex=regex, exact=exact
-        )
-        for pat in patterns
-        for col in search_cols
-    ]
+    if exact and not regex and len(prepared) > 1:
+        exprs = [
+            _match_exact_literals(
+                _column_expr(col, cast_cols), prepared, case_sensitive=case_sensitive
+            )
+            for col in search_cols
+        ]
+    else:
+        match = _pick_matcher(case_sensitive=case_sensitive, regex=regex, exact=exact)
+        exprs = [
+            match(_column_expr(col, cast_cols), pat)
+            for pat in prepared
+            for col in search_cols
+        ]
 
-    # Fast-path: If there's only one pattern and one column, avoid any_horizontal overhead.
-    if len(exprs) == 1:
-        return exprs[0]
+    return _or_all(exprs)
+
+
+@cache
+def _polars_has_streaming_engine() -> bool:
+    """Check whether the installed polars accepts ``collect(engine="streaming")``."""
+    import polars as pl
+
+    major, minor = (int(part) for part in pl.__version__.split(".")[:2])
+    return (major, minor) >= (1, 23)
+
+
+def _identity(frame: FrameT) -> FrameT:
+    """Return a result unchanged, for inputs that need no collect."""
+    return frame
 
-    return nw.any_horizontal(*exprs, ignore_nulls=True)
+
+def _collect(frame: nw.LazyFrame | nw.DataFrame) -> nw.DataFrame:
+    """Collect a lazy query, using polars' streaming engine when available.
+
+    The streaming engine evaluates the filter in chunks rather than over the
+    whole frame at once, which keeps peak memory down on large inputs. Frames
+    that are already eager are returned as is.
+    """
+    if isinstance(frame, nw.DataFrame):
+        return frame
+    if (
+        frame.implementation is nw.Implementation.POLARS
+        and _polars_has_streaming_engine()
+    ):
+        return frame.collect(engine="streaming")
+    return frame.collect()
+
+
+def _resolve_frame(
+    df: FrameT,
+) -> tuple[nw.LazyFrame | nw.DataFrame, Callable[[Any], nw.LazyFrame | nw.DataFrame]]:
+    """Wrap the input with Narwhals and pick how results are finalized.
+
+    Lazy input stays lazy. Eager input is searched through a lazy plan and
+    collected back into a DataFrame, except for small frames, which are
+    searched directly.
+    """
+    nw_frame = nw.from_native(df, pass_through=True)
+    if isinstance(nw_frame, nw.LazyFrame):
+        return nw_frame, _identity
+    if isinstance(nw_frame, nw.DataFrame):
+        if len(nw_frame) < _EAGER_MAX_ROWS:
+            return nw_frame, _identity
+        return nw_frame.lazy(), _collect
+    # This branch should ideally not be reached if FrameT is correctly defined
+    # as DataFrame | LazyFrame, but it's good for robustness.
+    msg = f"Expected DataFrame or LazyFrame, got {type(nw_frame)}"
+    raise TypeError(msg)
+
+
+@cache
+def _highlight_module() -> ModuleType:
+    """Import `nwgrep.highlight` on first use.
+
+    The module imports from this one, so it can't be imported at the top of
+    the file; caching the lookup keeps the import machinery off repeat calls.
+    """
+    from nwgrep import highlight
+
+    return highlight
 
 
 def _apply_highlighting_to_result(
-    result: nw.LazyFrame,
+    df_nw: nw.LazyFrame | nw.DataFrame,
     *,
-    result_is_lazy: bool,
     patterns: list[str],
     case_sensitive: bool,
     regex: bool,
     exact: bool,
     search_cols: list[str],
+    cast_cols: list[str],
+    invert: bool,
 ) -> Styler | GT:
     """Handle all highlighting logic.
 
-    Note: result_is_lazy is a keyword-only boolean parameter that tracks whether
-    the original input was lazy. This is an internal implementation detail for
-    determining collection behavior, not a user-facing configuration option.
+    Highlighting always materializes the result, so the filter and the cell
+    masks are collected together even when the input was lazy.
     """
-    # Always collect if lazy (highlighting requires materialized data)
-    if result_is_lazy:
-        result_collected = result.collect()
-    else:
-        result_collected = (
-            result.collect() if isinstance(result, nw.LazyFrame) else result
-        )
-
-    # Convert to native
-    native_df = nw.to_native(result_collected, pass_through=True)
+    highlight = _highlight_module()
 
     # Construct highlighting config at this layer
-    from nwgrep.highlight import HighlightConfig, apply_highlighting
-
-    config = HighlightConfig(
+    config = highlight.HighlightConfig(
         patterns=patterns,
         case_sensitive=case_sensitive,
         regex=regex,
         exact=exact,
         search_cols=search_cols,
+        cast_cols=cast_cols,
+        invert=invert,
     )
 
-    return apply_highlighting(native_df, config)
+    native_df, cell_masks = highlight.filter_with_masks(df_nw, config)
+    return highlight.apply_highlighting(native_df, cell_masks)
 
 
 @overload
@@ -250,73 +460,73 @@ def nwgrep(
     0  Alice  active
     1    Bob  locked
     """
+    # Reject incompatible flags before doing any work on the frame
+    if count and highlight:
+        msg = "highlight and count parameters are incompatible"
+        raise ValueError(msg)
+
     # Convert to Narwhals (pass through if already Narwhals)
-    nw_frame = nw.from_native(df, pass_through=True)
-    if isinstance(nw_frame, nw.LazyFrame):
-        result_is_lazy = True
-        df_nw = nw_frame
-    elif isinstance(nw_frame, nw.DataFrame):
-        result_is_lazy = False
-        df_nw = nw_frame.lazy()
-    else:
-        # This branch should ideally not be reached if FrameT is correctly defined
-        # as DataFrame | LazyFrame, but it's good for robustness.
-        msg = f"Expected DataFrame or LazyFrame, got {type(nw_frame)}"
-        raise TypeError(msg)
+    df_nw, finalize = _resolve_frame(df)
 
-    # Convert single pattern to list
-    patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+    # Convert single pattern to list, dropping duplicates (order preserved)
+    patterns = [pattern] if isinstance(pattern, str) else list(dict.fromkeys(pattern))
 
     # Determine which columns to search
-    search_cols = _get_search_columns(df_nw, columns)
+    search_cols, cast_cols = _get_search_columns(df_nw, columns)
 
     if not search_cols:
-        # No searchable columns, return empty or full based on invert
-        result = df_nw.filter(nw.lit(invert))
-        return nw.to_native(
-            result if result_is_lazy else result.collect(), pass_through=True
-        )
+        # No searchable columns, so nothing matches: every row is kept when
+        # inverting, none otherwise. Return the frame itself or an empty slice
+        # rather than filtering on a constant, which copies every row.
+        if count:
+            return int(_collect(df_nw.select(nw.len())).item()) if invert else 0
+        result = df_nw if invert else df_nw.head(0)
+        return nw.to_native(finalize(result), pass_through=True)
 
     # Adjust pattern for whole word matching
     if whole_word:
-        patterns = [rf"\b{re.escape(pat)}\b" for pat in patterns]
+        patterns = [_whole_word_pattern(tuple(patterns))]
         regex = True
 
     # Build matching expressions for each pattern
     match_expr = _build_match_expr(
-        search_cols, patterns, case_sensitive=case_sensitive, regex=regex, exact=exact
+        tuple(search_cols),
+        tuple(patterns),
+        case_sensitive=case_sensitive,
+        regex=regex,
+        exact=exact,
+        cast_cols=frozenset(cast_cols),
     )
 
-    # Invert if requested (grep -v)
+    # Invert if requested (grep -v). A null cell doesn't match, so fill nulls
+    # first: negating a null mask would otherwise drop the row on some backends
     mask = match_expr
     if invert:
-        mask = ~mask
-
-    result = df_nw.filter(mask)
+        mask = ~mask.fill_null(False)
 
     # If count requested, return integer count
     if count:
-        if highlight:
-            msg = "highlight and count parameters are incompatible"
-            raise ValueError(msg)
-        # .item() returns the scalar value. We know nw.len() returns an integer.
-        # Cast to int to satisfy the type checker and handle backend-specific int types.
-        count_value = result.select(nw.len()).collect().item()
+        # Sum the boolean mask directly: a single reduction over the predicate,
+        # without building a filtered frame. The mask is cast to Int64 first
+        # since not every backend sums booleans (SQL engines often don't), and
+        # the result is cast to int to satisfy the type checker.
+        count_value = _collect(df_nw.select(mask.cast(nw.Int64).sum())).item()
         return int(count_value)  # type: ignore[arg-type]
 
     # Handle highlighting
     if highlight:
         return _apply_highlighting_to_result(
-            result,
-            result_is_lazy=result_is_lazy,
+            df_nw,
             patterns=patterns,
             case_sensitive=case_sensitive,
             regex=regex,
             exact=exact,
             search_cols=search_cols,
+            cast_cols=cast_cols,
+            invert=invert,
         )
 
+    result = df_nw.filter(mask)
+
     # Return in the same format as input (Narwhals or native)
-    return nw.to_native(
-        result if result_is_lazy else result.collect(), pass_through=True
-    )
+    return nw.to_native(finalize(result), pass_through=True)
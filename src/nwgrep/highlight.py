@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
 import narwhals as nw
@@ -9,7 +9,7 @@ if TYPE_CHECKING:
     from great_tables import GT
     from pandas.io.formats.style import Styler
 
-from nwgrep.core import _build_column_match, _get_search_columns
+from nwgrep.core import _build_match_expr, _collect
 
 
 @dataclass
@@ -20,88 +20,111 @@ class HighlightConfig:
     case_sensitive: bool
     regex: bool
     exact: bool
-    search_cols: list[str] | None
+    search_cols: list[str]
+    cast_cols: list[str] = field(default_factory=list)
+    invert: bool = False
+
+
+# Backend names by concrete frame type, filled in the first time a type is seen
+_BACKENDS: dict[type, str] = {}
+
+
+def _backend_for_type(frame_type: type) -> str:
+    """Find the backend a frame type belongs to from its (or a base's) module."""
+    for cls in frame_type.__mro__:
+        base_module = cls.__module__.partition(".")[0]
+        if base_module in {"pandas", "polars"}:
+            return base_module
+    return "unsupported"
 
 
 def _detect_backend(df_native: Any) -> str:
     """Detect the dataframe backend (pandas, polars, or other)."""
-    module = type(df_native).__module__
-    if not module:
-        return "unsupported"
-    base_module = module.partition(".")[0]
-    if base_module == "pandas":
-        return "pandas"
-    if base_module == "polars":
-        return "polars"
-    return "unsupported"
+    frame_type = type(df_native)
+    backend = _BACKENDS.get(frame_type)
+    if backend is None:
+        backend = _BACKENDS[frame_type] = _backend_for_type(frame_type)
+    return backend
+
 
+def _mask_column_name(index: int) -> str:
+    """Name of the temporary column holding a search column's highlight mask."""
+    return f"__nwgrep_mask_{index}__"
 
-def _get_matching_mask_dict(
-    df_native: Any, config: HighlightConfig
-) -> dict[str, list[bool]]:
-    """Build a mask of cells containing matches using Narwhals."""
-    # Convert to Narwhals LazyFrame
-    nw_frame = nw.from_native(df_native, pass_through=True)
-    df_nw = nw_frame.lazy()
 
-    # Determine columns to search
-    cols_to_check = _get_search_columns(df_nw, config.search_cols)
+def filter_with_masks(
+    df_nw: nw.LazyFrame | nw.DataFrame, config: HighlightConfig
+) -> tuple[Any, dict[str, nw.Series[Any]]]:
+    """Filter rows and compute the per-cell highlight masks in one query.
 
-    if not cols_to_check:
-        return {}
+    The masks are added as temporary columns and the rows are filtered on
+    those columns, so the string matching runs once even on eager backends.
+    Returns the native filtered frame and one boolean Series per searched
+    column.
+    """
 
     def build_column_mask(col: str) -> nw.Expr:
         """Build OR expression across all patterns for a column."""
-        col_expr = nw.col(col)
-        pattern_matches = [
-            _build_column_match(
-                col_expr,
-                pat,
-                case_sensitive=config.case_sensitive,
-                regex=config.regex,
-                exact=config.exact,
-            )
-            & ~col_expr.is_null()
-            for pat in config.patterns
-        ]
-        return nw.any_horizontal(*pattern_matches, ignore_nulls=True).alias(col)
-
-    # Build mask expression for each column
-    select_exprs = [build_column_mask(col) for col in cols_to_check]
-
-    if not select_exprs:
-        return {}
-
-    # Execute the query to get boolean dataframe
-    mask_df = df_nw.select(select_exprs).collect()
-
-    # Convert to native dictionary of lists
-    return mask_df.to_dict(as_series=False)
-
-
-def _highlight_pandas_dataframe(df: Any, config: HighlightConfig) -> Styler:
-    """Highlight matching cells in a pandas DataFrame with yellow background."""
-    # Get mask of matching cells
-    mask = _get_matching_mask_dict(df, config)
+        # Reuse the filter's builder, so each column gets the same fused
+        # alternation or single is_in, and is lowercased at most once
+        match = _build_match_expr(
+            (col,),
+            tuple(config.patterns),
+            case_sensitive=config.case_sensitive,
+            regex=config.regex,
+            exact=config.exact,
+            cast_cols=frozenset(config.cast_cols),
+        )
+        # Null cells yield null matches; they're never highlighted
+        return match.fill_null(False)
+
+    mask_names = {_mask_column_name(i): col for i, col in enumerate(config.search_cols)}
 
-    # Build a boolean dataframe for styling
+    # A row matches if any of its cells do. The masks already have nulls
+    # filled, so this is the same row filter nwgrep builds for the columns
+    matched = (
+        nw.col(*mask_names)
+        if len(mask_names) == 1
+        else nw.any_horizontal(*mask_names, ignore_nulls=True)
+    )
+    if config.invert:
+        matched = ~matched
+
+    collected = _collect(
+        df_nw.with_columns(
+            build_column_mask(col).alias(name) for name, col in mask_names.items()
+        ).filter(matched)
+    )
+
+    masks = {col: collected.get_column(name) for name, col in mask_names.items()}
+    native_df = nw.to_native(collected.drop(*mask_names), pass_through=True)
+    return native_df, masks
+
+
+def _highlight_pandas_dataframe(df: Any, mask: dict[str, nw.Series[Any]]) -> Styler:
+    """Highlight matching cells in a pandas DataFrame with yellow background."""
+    # Build a boolean array for styling. A plain ndarray is enough here; only
+    # the searched columns are filled in
+    import numpy as np
     import pandas as pd
 
-    style_mask = pd.DataFrame(False, index=df.index, columns=df.columns)
+    style_mask = np.zeros(df.shape, dtype=bool)
+    col_pos = {col: i for i, col in enumerate(df.columns)}
     for col, col_mask in mask.items():
-        if col in style_mask.columns:
-            style_mask[col] = col_mask
-
-    return df.style.apply(
-        lambda row: [
-            "background-color: #ffff99" if style_mask.loc[row.name, col] else ""
-            for col in df.columns
-        ],
-        axis=1,
+        if col in col_pos:
+            style_mask[:, col_pos[col]] = col_mask.to_numpy()
+
+    # Turn the mask into a frame of CSS strings in one vectorized step and hand
+    # it to the Styler whole, instead of calling a Python function per row
+    css = pd.DataFrame(
+        np.where(style_mask, "background-color: #ffff99", ""),
+        index=df.index,
+        columns=df.columns,
     )
+    return df.style.apply(lambda _: css, axis=None)
 
 
-def _highlight_polars_dataframe(df: Any, config: HighlightConfig) -> GT:
+def _highlight_polars_dataframe(df: Any, mask: dict[str, nw.Series[Any]]) -> GT:
     """Highlight matching cells in a polars DataFrame using Great Tables."""
     try:
         from great_tables import GT, loc, style
@@ -112,33 +135,40 @@ def _highlight_polars_dataframe(df: Any, config: HighlightConfig) -> GT:
         )
         raise ImportError(msg) from e
 
-    # Get mask of matching cells
-    mask = _get_matching_mask_dict(df, config)
-
-    # Build a boolean expression for matching cells
-    gt = GT(df)
-
-    # Apply highlighting to each matching cell
+    # Group columns by their matching rows, so columns that match on the
+    # same rows share one location
+    columns_by_rows: dict[tuple[int, ...], list[str]] = {}
     for col, col_mask in mask.items():
-        # Create a polars expression that evaluates to True for matching rows
-        matching_rows = [i for i, matched in enumerate(col_mask) if matched]
-        if matching_rows:
-            gt = gt.tab_style(
-                style=style.fill(color="#ffff99"),
-                locations=loc.body(columns=col, rows=matching_rows),
-            )
+        # Skip columns without matches before extracting any row indices
+        if not col_mask.any():
+            continue
+        # Let the backend find the matching row positions rather than looping
+        # over every row in Python
+        matching_rows = tuple(col_mask.arg_true().to_list())
+        columns_by_rows.setdefault(matching_rows, []).append(col)
 
-    return gt
+    gt = GT(df)
+    if not columns_by_rows:
+        return gt
+
+    # Style every matching cell with a single tab_style call
+    return gt.tab_style(
+        style=style.fill(color="#ffff99"),
+        locations=[
+            loc.body(columns=cols, rows=list(rows))
+            for rows, cols in columns_by_rows.items()
+        ],
+    )
 
 
-def apply_highlighting(df_native: Any, config: HighlightConfig) -> Styler | GT:
+def apply_highlighting(df_native: Any, mask: dict[str, nw.Series[Any]]) -> Styler | GT:
     """Apply cell-level highlighting based on the dataframe backend."""
     backend = _detect_backend(df_native)
     match backend:
         case "pandas":
-            return _highlight_pandas_dataframe(df_native, config)
+            return _highlight_pandas_dataframe(df_native, mask)
         case "polars":
-            return _highlight_polars_dataframe(df_native, config)
+            return _highlight_polars_dataframe(df_native, mask)
         case _:
             msg = f"Highlighting not supported for backend: {backend}"
             raise ValueError(msg)
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+def has(col: Any, val: Any) -> bool:
+    """Check whether a pandas/polars Series or pyarrow array contains a value.
+
+    Membership is tested on a plain Python list rather than a numpy object
+    array, so the same helper works for every backend's column type.
+    """
+    values = col.to_pylist() if hasattr(col, "to_pylist") else col.to_list()
+    return val in values
@@ -6,6 +6,7 @@ import pytest
 
 if TYPE_CHECKING:
     from collections.abc import Callable
+    from types import ModuleType
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -15,14 +16,55 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         default="pandas",
         help="Backend to use for tests (pandas, polars, pyarrow)",
     )
+    parser.addoption(
+        "--runslow",
+        action="store_true",
+        default=False,
+        help="Also run tests marked slow (large inputs)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "slow: large-input test, run with --runslow")
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(scope="session")
+def pd_mod() -> ModuleType:
+    """The pandas module, skipping the test if it isn't installed."""
+    return pytest.importorskip("pandas")
+
+
+@pytest.fixture(scope="session")
+def pl_mod() -> ModuleType:
+    """The polars module, skipping the test if it isn't installed."""
+    return pytest.importorskip("polars")
+
+
+@pytest.fixture(scope="session")
+def grep_accessor() -> None:
+    """Install the .grep accessor once for the whole test session."""
+    from nwgrep import register_grep_accessor
+
+    register_grep_accessor()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def backend(request: pytest.FixtureRequest) -> str:
     return request.config.getoption("--backend")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def constructor(backend: str) -> Callable[[dict[str, list[Any]]], Any]:
     if backend == "pandas":
         import pandas as pd
@@ -5,11 +5,12 @@ Catch cases where e.g. files are missing so the import doesn't work.
 
 from __future__ import annotations
 
-import subprocess
-import sys
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
 
 import nwgrep
 from nwgrep import nwgrep as nwgrep_func
+from nwgrep.cli import main as cli_main
 
 # 1. Check version
 print(f"nwgrep version: {nwgrep.__version__}")
@@ -30,25 +31,25 @@ except ImportError as e:
     msg = f"Failed to import nwgrep.accessor: {e}"
     raise RuntimeError(msg) from e
 
-# 3. Basic CLI help check (optional - skip if CLI dependencies not installed)
+# 3. Basic CLI help check (optional - skip if CLI dependencies not installed).
+# Run in-process: importing nwgrep.cli already proves the module was packaged.
+stdout, stderr = StringIO(), StringIO()
 try:
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "--help"], check=False, capture_output=True
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        cli_main(["--help"])
+    returncode = 0
+except SystemExit as e:
+    returncode = e.code if isinstance(e.code, int) else 1
+if returncode == 0:
+    print("CLI help check succeeded")
+elif "missing required dependencies" in stderr.getvalue():
+    # Expected when testing without [cli]
+    print(
+        "CLI dependencies not installed, skipping CLI test (expected for base install)"
     )
-    if result.returncode == 0:
-        print("CLI help check succeeded")
-    else:
-        stderr = result.stderr.decode()
-        # Check if this is a missing dependencies error (expected when testing without [cli])
-        if "missing required dependencies" in stderr:
-            print(
-                "CLI dependencies not installed, skipping CLI test (expected for base install)"
-            )
-        else:
-            msg = f"CLI help check failed unexpectedly: {stderr}"
-            raise RuntimeError(msg)
-except FileNotFoundError:
-    print("CLI module not found, skipping CLI test")
+else:
+    msg = f"CLI help check failed unexpectedly: {stderr.getvalue()}"
+    raise RuntimeError(msg)
 
 # 4. Functional check if a backend is available
 try:
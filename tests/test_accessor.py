@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import pytest
 
-from nwgrep import register_grep_accessor
+from tests._helpers import has
+
+if TYPE_CHECKING:
+    from types import ModuleType
 
-pd = pytest.importorskip("pandas")
 
+pytestmark = pytest.mark.usefixtures("grep_accessor")
 
-def test_pandas_grep_accessor() -> None:
-    register_grep_accessor()
 
-    df = pd.DataFrame(
+def test_pandas_grep_accessor(pd_mod: ModuleType) -> None:
+    df = pd_mod.DataFrame(
         {"name": ["Alice", "Bob", "Eve"], "status": ["active", "locked", "active"]}
     )
 
@@ -19,17 +23,15 @@ def test_pandas_grep_accessor() -> None:
 
     result = df.grep("active")
     assert len(result) == 2
-    assert "Alice" in result["name"].to_numpy()
+    assert has(result["name"], "Alice")
 
     # Test with kwargs
     result = df.grep("ACTIVE", case_sensitive=False)
     assert len(result) == 2
 
 
-def test_pandas_grep_specific_columns() -> None:
-    register_grep_accessor()
-
-    df = pd.DataFrame(
+def test_pandas_grep_specific_columns(pd_mod: ModuleType) -> None:
+    df = pd_mod.DataFrame(
         {"name": ["Alice", "Bob", "Eve"], "status": ["active", "locked", "active"]}
     )
 
@@ -37,10 +39,10 @@ def test_pandas_grep_specific_columns() -> None:
     assert len(result) == 2
 
 
-def test_pandas_grep_regex() -> None:
-    register_grep_accessor()
-
-    df = pd.DataFrame({"email": ["alice@test.com", "bob@example.com", "eve@test.com"]})
+def test_pandas_grep_regex(pd_mod: ModuleType) -> None:
+    df = pd_mod.DataFrame(
+        {"email": ["alice@test.com", "bob@example.com", "eve@test.com"]}
+    )
 
     result = df.grep(r".*@test\.com", regex=True)
     assert len(result) == 2
@@ -1,318 +1,476 @@
 from __future__ import annotations
 
+import importlib.util
+import json
 import subprocess
 import sys
-from pathlib import Path  # noqa: TC003
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import pytest
 
-pd = pytest.importorskip("pandas")
+from nwgrep.cli import main
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
 
-def test_cli_basic_search(tmp_path: Path) -> None:
-    """Test basic CLI search functionality."""
-    # Create test parquet file
-    df = pd.DataFrame(
-        {"name": ["Alice", "Bob", "Eve"], "status": ["active", "locked", "active"]}
-    )
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+pd = pytest.importorskip("pandas")
 
-    # Run CLI
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "active", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
+
+def _write_file(
+    tmp_path_factory: pytest.TempPathFactory,
+    data: dict[str, list[Any]],
+    suffix: str = ".feather",
+) -> Path:
+    """Write a small file shared by the tests in this module.
+
+    Feather (Arrow IPC) is the default since it's much cheaper to write than
+    parquet; parquet is only used where the test is about parquet scanning.
+    """
+    test_file = tmp_path_factory.mktemp("cli") / f"test{suffix}"
+    df = pd.DataFrame(data)
+    if suffix == ".parquet":
+        df.to_parquet(test_file)
+    else:
+        df.to_feather(test_file)
+    return test_file
+
+
+@pytest.fixture(scope="module")
+def cli_file(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Callable[[dict[str, list[Any]]], Path]:
+    """Return a writer that creates one feather file per distinct data."""
+    files: dict[str, Path] = {}
+
+    def write(data: dict[str, list[Any]]) -> Path:
+        key = repr(data)
+        if key not in files:
+            files[key] = _write_file(tmp_path_factory, data)
+        return files[key]
+
+    return write
+
+
+@pytest.fixture(scope="module")
+def name_status_parquet(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_file(
+        tmp_path_factory,
+        {"name": ["Alice", "Bob", "Eve"], "status": ["active", "locked", "active"]},
+        suffix=".parquet",
     )
 
-    assert result.returncode == 0
-    assert "Alice" in result.stdout
-    assert "Eve" in result.stdout
-    assert "Bob" not in result.stdout
 
+@pytest.fixture(scope="module")
+def foo_bar_baz_feather(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_file(tmp_path_factory, {"col": ["foo", "bar", "baz"]})
 
-def test_cli_case_insensitive(tmp_path: Path) -> None:
-    """Test case-insensitive search."""
-    df = pd.DataFrame({"text": ["HELLO", "world"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-i", "hello", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
+@pytest.fixture(scope="module")
+def foo_bar_food_parquet(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_file(
+        tmp_path_factory, {"col": ["foo", "bar", "food"]}, suffix=".parquet"
     )
 
-    assert result.returncode == 0
-    assert "HELLO" in result.stdout
 
+class CliResult(NamedTuple):
+    """Exit code and captured output of an in-process CLI run."""
 
-def test_cli_invert_match(tmp_path: Path) -> None:
-    """Test inverted matching."""
-    df = pd.DataFrame({"col": ["foo", "bar", "baz"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+    returncode: int
+    stdout: str
+    stderr: str
 
+
+def run_cli(capsys: pytest.CaptureFixture[str], *args: str) -> CliResult:
+    """Run the CLI in-process, capturing its exit code and output."""
+    try:
+        main(list(args))
+        returncode = 0
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else 1
+    captured = capsys.readouterr()
+    return CliResult(returncode, captured.out, captured.err)
+
+
+def test_cli_basic_search(name_status_parquet: Path) -> None:
+    """Test basic CLI search through `python -m nwgrep.cli` in a subprocess."""
+    # Run CLI
     result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-v", "foo", str(test_file)],
+        [sys.executable, "-m", "nwgrep.cli", "active", str(name_status_parquet)],
         capture_output=True,
-        text=True,
         check=False,
     )
 
+    # Compare raw bytes: no decode pass, and no dependence on the locale
     assert result.returncode == 0
-    assert "foo" not in result.stdout
-    assert "bar" in result.stdout
+    assert b"Alice" in result.stdout
+    assert b"Eve" in result.stdout
+    assert b"Bob" not in result.stdout
+
+
+# (data, args, {text: whether it's in stdout}). Each scenario is one
+# in-process CLI run over a small file, written once per distinct data.
+CLI_SCENARIOS = [
+    pytest.param(
+        {"text": ["HELLO", "world"]}, ["-i", "hello"], {"HELLO": True}, id="ignore-case"
+    ),
+    pytest.param(
+        {"col": ["foo", "bar", "baz"]},
+        ["-v", "foo"],
+        {"bar": True, "foo": False},
+        id="invert",
+    ),
+    pytest.param(
+        {
+            "name": ["Alice", "Bob"],
+            "email": ["a@foo.com", "b@bar.com"],
+            "x": ["foo", ""],
+        },
+        ["--columns", "name, email", "foo"],
+        {"Alice": True, "Bob": False},
+        id="columns-with-spaces",
+    ),
+    pytest.param(
+        {"col": ["foo", "bar", "baz"]},
+        ["--format", "csv", "foo"],
+        {"col": True, "foo": True},
+        id="csv-output",
+    ),
+    pytest.param(
+        {"col": ["foo", "bar"], "n": [1, 2]},
+        ["--format", "tsv", "foo"],
+        {"col\tn\n": True, "foo\t1\n": True, ",": False, "bar": False},
+        id="tsv-output",
+    ),
+    pytest.param(
+        {"col": ["foo123", "bar456", "baz789"]},
+        ["-E", "foo.*"],
+        {"foo123": True, "bar456": False},
+        id="regex",
+    ),
+    pytest.param(
+        {"col": ["foo", "foobar", "barfoo"]},
+        ["-w", "foo"],
+        {"foo": True, "foobar": False, "barfoo": False},
+        id="whole-word",
+    ),
+    pytest.param(
+        {"status": ["active", "user_active", "locked"]},
+        ["-x", "active"],
+        {"active": True, "user_active": False},
+        id="exact",
+    ),
+    pytest.param(
+        {"col": ["foo123", "bar456", "baz"]},
+        ["-x", "-E", "foo.*"],
+        {"foo123": True, "bar456": False},
+        id="exact-regex",
+    ),
+    # -n through the streaming sinks and through the collected table output
+    pytest.param(
+        {"col": ["foo1", "foo2", "bar"]},
+        ["-n", "1", "--format", "csv", "foo"],
+        {"foo1": True, "foo2": False},
+        id="max-rows-csv",
+    ),
+    pytest.param(
+        {"col": ["foo1", "foo2", "bar"]},
+        ["-n", "1", "--format", "ndjson", "foo"],
+        {"foo1": True, "foo2": False},
+        id="max-rows-ndjson",
+    ),
+    pytest.param(
+        {"col": ["foo1", "foo2", "bar"]},
+        ["-n", "1", "foo"],
+        {"shape: (1, 1)": True, "foo1": True, "foo2": False},
+        id="max-rows-table",
+    ),
+]
+
+
+@pytest.mark.parametrize(("data", "args", "expected"), CLI_SCENARIOS)
+def test_cli_scenarios(
+    cli_file: Callable[[dict[str, list[Any]]], Path],
+    capsys: pytest.CaptureFixture[str],
+    data: dict[str, list[Any]],
+    args: list[str],
+    expected: dict[str, bool],
+) -> None:
+    """Test that each flag combination keeps and drops the expected rows."""
+    result = run_cli(capsys, *args, str(cli_file(data)))
+
+    assert result.returncode == 0
+    for text, present in expected.items():
+        assert (text in result.stdout) is present, text
 
 
-def test_cli_file_not_found() -> None:
+def test_cli_file_not_found(capsys: pytest.CaptureFixture[str]) -> None:
     """Test error handling for missing file."""
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "pattern", "nonexistent.parquet"],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    result = run_cli(capsys, "pattern", "nonexistent.parquet")
 
     assert result.returncode == 1
     assert "not found" in result.stderr.lower()
 
 
-def test_cli_csv_output(tmp_path: Path) -> None:
-    """Test CSV output format."""
-    df = pd.DataFrame({"col": ["foo", "bar"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+@pytest.mark.parametrize("max_rows", ["-1", "0", "ten"])
+def test_cli_max_rows_must_be_positive(
+    foo_bar_food_parquet: Path, capsys: pytest.CaptureFixture[str], max_rows: str
+) -> None:
+    """Test that a non-positive --max-rows is a usage error."""
+    result = run_cli(capsys, "-n", max_rows, "foo", str(foo_bar_food_parquet))
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "--format", "csv", "foo", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    assert result.returncode == 2
+    assert "must be a positive integer" in result.stderr
+
+
+def test_cli_ndjson_output(
+    cli_file: Callable[[dict[str, list[Any]]], Path], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test NDJSON output is one JSON object per matching row."""
+    test_file = cli_file({"col": ["foo", "bar", "foo2"], "n": [1, 2, 3]})
+
+    result = run_cli(capsys, "--format", "ndjson", "foo", str(test_file))
 
     assert result.returncode == 0
-    assert "col" in result.stdout  # CSV header
-    assert "foo" in result.stdout
+    rows = [json.loads(line) for line in result.stdout.splitlines()]
+    assert rows == [{"col": "foo", "n": 1}, {"col": "foo2", "n": 3}]
 
 
-def test_cli_regex_pattern(tmp_path: Path) -> None:
-    """Test regex pattern matching."""
-    df = pd.DataFrame({"col": ["foo123", "bar456", "baz789"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+def test_cli_count(
+    foo_bar_food_parquet: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test CLI count flag."""
+    result = run_cli(capsys, "--count", "foo", str(foo_bar_food_parquet))
+
+    assert result.returncode == 0
+    assert result.stdout.strip() == "2"
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-E", "foo.*", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+
+def test_cli_count_no_matches(
+    foo_bar_baz_feather: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test CLI count with no matches."""
+    result = run_cli(capsys, "--count", "xyz", str(foo_bar_baz_feather))
 
     assert result.returncode == 0
-    assert "foo123" in result.stdout
-    assert "bar456" not in result.stdout
+    assert result.stdout.strip() == "0"
 
 
-def test_cli_whole_word_match(tmp_path: Path) -> None:
-    """Test whole word matching."""
-    df = pd.DataFrame({"col": ["foo", "foobar", "barfoo"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+def test_cli_fixed_strings_conflict(
+    foo_bar_baz_feather: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test CLI error for -F -w conflict."""
+    result = run_cli(capsys, "-F", "-w", "foo", str(foo_bar_baz_feather))
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-w", "foo", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    assert result.returncode == 1
+    assert "incompatible" in result.stderr.lower()
+
+
+def test_cli_fixed_strings_override(
+    cli_file: Callable[[dict[str, list[Any]]], Path], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test CLI warning for -F -E conflict."""
+    test_file = cli_file({"col": ["foo.*", "bar"]})
+
+    result = run_cli(capsys, "-F", "-E", "foo.*", str(test_file))
 
     assert result.returncode == 0
-    assert "foo" in result.stdout
-    assert "foobar" not in result.stdout
-    assert "barfoo" not in result.stdout
+    assert "warning" in result.stderr.lower()
+    assert "foo.*" in result.stdout  # Should match literal "foo.*"
 
 
-def test_cli_count(tmp_path: Path) -> None:
-    """Test CLI count flag."""
-    df = pd.DataFrame({"col": ["foo", "bar", "foo"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+def test_cli_exact_with_count(
+    cli_file: Callable[[dict[str, list[Any]]], Path], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test combining exact match with count."""
+    test_file = cli_file({"status": ["active", "active", "user_active"]})
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "--count", "foo", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    result = run_cli(capsys, "-x", "--count", "active", str(test_file))
 
     assert result.returncode == 0
     assert result.stdout.strip() == "2"
 
 
-def test_cli_count_no_matches(tmp_path: Path) -> None:
-    """Test CLI count with no matches."""
-    df = pd.DataFrame({"col": ["foo", "bar"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
-
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "--count", "xyz", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+def test_cli_files_with_matches(
+    foo_bar_baz_feather: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test -l flag prints filename when there are matches."""
+    result = run_cli(capsys, "-l", "foo", str(foo_bar_baz_feather))
 
     assert result.returncode == 0
-    assert result.stdout.strip() == "0"
+    assert result.stdout.strip() == str(foo_bar_baz_feather)
+    assert (
+        "foo" not in result.stdout or str(foo_bar_baz_feather) in result.stdout
+    )  # Only filename
 
 
-def test_cli_exact_match(tmp_path: Path) -> None:
-    """Test CLI exact match flag."""
-    df = pd.DataFrame({"status": ["active", "user_active", "locked"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+def test_cli_files_with_matches_no_match(
+    foo_bar_baz_feather: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test -l flag prints nothing when there are no matches."""
+    result = run_cli(capsys, "-l", "xyz", str(foo_bar_baz_feather))
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-x", "active", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    assert result.returncode == 0
+    assert result.stdout.strip() == ""
+
+
+def test_cli_files_with_matches_long_flag(
+    foo_bar_baz_feather: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test --files-with-matches long flag."""
+    result = run_cli(capsys, "--files-with-matches", "foo", str(foo_bar_baz_feather))
 
     assert result.returncode == 0
-    assert "active" in result.stdout
-    assert "user_active" not in result.stdout
+    assert result.stdout.strip() == str(foo_bar_baz_feather)
 
 
-def test_cli_exact_match_regex(tmp_path: Path) -> None:
-    """Test CLI exact match with regex."""
-    df = pd.DataFrame({"col": ["foo123", "bar456", "baz"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+def test_cli_multiple_files(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that several files are searched together as one scan."""
+    pd.DataFrame({"col": ["foo", "bar"]}).to_parquet(tmp_path / "a.parquet")
+    pd.DataFrame({"col": ["food", "baz"]}).to_parquet(tmp_path / "b.parquet")
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-x", "-E", "foo.*", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
+    result = run_cli(
+        capsys,
+        "--count",
+        "foo",
+        str(tmp_path / "a.parquet"),
+        str(tmp_path / "b.parquet"),
     )
 
     assert result.returncode == 0
-    assert "foo123" in result.stdout
-    assert "bar456" not in result.stdout
+    assert result.stdout.strip() == "2"
 
 
-def test_cli_fixed_strings_conflict(tmp_path: Path) -> None:
-    """Test CLI error for -F -w conflict."""
-    df = pd.DataFrame({"col": ["foo"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+def test_cli_multiple_files_different_schemas(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that files with different columns are stacked by column name."""
+    pd.DataFrame({"name": ["Alice", "Bob"], "status": ["active", "locked"]}).to_parquet(
+        tmp_path / "a.parquet"
+    )
+    pd.DataFrame({"id": [1, 2], "state": ["active", "idle"]}).to_parquet(
+        tmp_path / "b.parquet"
+    )
+    pd.DataFrame({"name": ["Carol"], "status": ["active"]}).to_parquet(
+        tmp_path / "c.parquet"
+    )
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-F", "-w", "foo", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
+    result = run_cli(capsys, "--format", "csv", "active", str(tmp_path / "*.parquet"))
+
+    # Rows keep the file order; columns a file lacks are left empty
+    assert result.returncode == 0
+    assert result.stdout.splitlines() == [
+        "name,status,id,state",
+        "Alice,active,,",
+        ",,1,active",
+        "Carol,active,,",
+    ]
+
+
+def test_cli_multiple_files_incompatible_schemas(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that files whose dtypes can't be combined fail with a clean error."""
+    pd.DataFrame({"name": ["active"], "x": [[1]]}).to_parquet(tmp_path / "a.parquet")
+    pd.DataFrame({"name": ["active"], "x": [{"a": 1}]}).to_parquet(
+        tmp_path / "b.parquet"
+    )
+
+    result = run_cli(
+        capsys,
+        "--format",
+        "csv",
+        "active",
+        str(tmp_path / "a.parquet"),
+        str(tmp_path / "b.parquet"),
     )
 
     assert result.returncode == 1
-    assert "incompatible" in result.stderr.lower()
+    assert "Error during search" in result.stderr
 
 
-def test_cli_fixed_strings_override(tmp_path: Path) -> None:
-    """Test CLI warning for -F -E conflict."""
-    df = pd.DataFrame({"col": ["foo.*", "bar"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+def test_cli_files_with_matches_glob(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test -l with a quoted glob lists each matching file."""
+    pd.DataFrame({"col": ["foo", "bar"]}).to_parquet(tmp_path / "a.parquet")
+    pd.DataFrame({"col": ["baz"]}).to_parquet(tmp_path / "b.parquet")
+    pd.DataFrame({"col": ["foo"]}).to_feather(tmp_path / "c.feather")
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-F", "-E", "foo.*", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
+    result = run_cli(
+        capsys, "-l", "foo", str(tmp_path / "*.parquet"), str(tmp_path / "c.feather")
     )
 
     assert result.returncode == 0
-    assert "warning" in result.stderr.lower()
-    assert "foo.*" in result.stdout  # Should match literal "foo.*"
-
-
-def test_cli_exact_with_count(tmp_path: Path) -> None:
-    """Test combining exact match with count."""
-    df = pd.DataFrame({"status": ["active", "active", "user_active"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
-
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-x", "--count", "active", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
+    assert result.stdout.splitlines() == [
+        str(tmp_path / "a.parquet"),
+        str(tmp_path / "c.feather"),
+    ]
+
+
+def test_cli_parallel_strategy(
+    foo_bar_food_parquet: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that --parallel is accepted and doesn't change the matches."""
+    result = run_cli(
+        capsys, "--parallel", "row_groups", "--count", "foo", str(foo_bar_food_parquet)
     )
 
     assert result.returncode == 0
     assert result.stdout.strip() == "2"
 
 
-def test_cli_files_with_matches(tmp_path: Path) -> None:
-    """Test -l flag prints filename when there are matches."""
-    df = pd.DataFrame({"col": ["foo", "bar", "baz"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
-
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-l", "foo", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
+def test_cli_in_memory_engine(
+    foo_bar_food_parquet: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that --engine in-memory collects and writes the same rows."""
+    result = run_cli(
+        capsys,
+        "--engine",
+        "in-memory",
+        "--format",
+        "csv",
+        "foo",
+        str(foo_bar_food_parquet),
     )
 
     assert result.returncode == 0
-    assert result.stdout.strip() == str(test_file)
-    assert (
-        "foo" not in result.stdout or str(test_file) in result.stdout
-    )  # Only filename
+    assert result.stdout.splitlines() == ["col", "foo", "food"]
 
 
-def test_cli_files_with_matches_no_match(tmp_path: Path) -> None:
-    """Test -l flag prints nothing when there are no matches."""
-    df = pd.DataFrame({"col": ["foo", "bar", "baz"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+@pytest.mark.parametrize("fmt", ["csv", "tsv", "ndjson"])
+def test_cli_in_memory_engine_matches_streaming_sink(
+    cli_file: Callable[[dict[str, list[Any]]], Path],
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+    fmt: str,
+) -> None:
+    """Test that --engine in-memory bypasses the sinks but writes the same output."""
+    from nwgrep import cli
 
-    result = subprocess.run(
-        [sys.executable, "-m", "nwgrep.cli", "-l", "xyz", str(test_file)],
-        capture_output=True,
-        text=True,
-        check=False,
+    test_file = str(cli_file({"col": ["foo", "bar", "food"], "n": [1, 2, 3]}))
+    streamed = run_cli(capsys, "--format", fmt, "foo", test_file)
+
+    def fail_sink(_: object) -> None:
+        pytest.fail("the in-memory engine must not use the streaming sink")
+
+    monkeypatch.setitem(cli._SINKS, fmt, fail_sink)
+    collected = run_cli(
+        capsys, "--engine", "in-memory", "--format", fmt, "foo", test_file
     )
 
-    assert result.returncode == 0
-    assert result.stdout.strip() == ""
+    assert streamed.returncode == collected.returncode == 0
+    assert collected.stdout == streamed.stdout
 
 
-def test_cli_files_with_matches_long_flag(tmp_path: Path) -> None:
-    """Test --files-with-matches long flag."""
-    df = pd.DataFrame({"col": ["foo", "bar"]})
-    test_file = tmp_path / "test.parquet"
-    df.to_parquet(test_file)
+def test_cli_gpu_engine_requires_cudf_polars(
+    foo_bar_baz_feather: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that --engine gpu fails with a clear message without cudf-polars."""
+    if importlib.util.find_spec("cudf_polars") is not None:
+        pytest.skip("cudf-polars is installed")
 
-    result = subprocess.run(
-        [
-            sys.executable,
-            "-m",
-            "nwgrep.cli",
-            "--files-with-matches",
-            "foo",
-            str(test_file),
-        ],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    result = run_cli(capsys, "--engine", "gpu", "foo", str(foo_bar_baz_feather))
 
-    assert result.returncode == 0
-    assert result.stdout.strip() == str(test_file)
+    assert result.returncode == 1
+    assert "cudf-polars" in result.stderr
@@ -1,21 +1,21 @@
 from __future__ import annotations
 
+import importlib.util
+from typing import TYPE_CHECKING, Any
+
 import pytest
 
-from nwgrep import nwgrep, register_grep_accessor
+from nwgrep import nwgrep
+
+if TYPE_CHECKING:
+    from types import ModuleType
 
 pd = pytest.importorskip("pandas")
-pl = pytest.importorskip("polars")
 
 
-def _has_great_tables() -> bool:
-    """Check if Great Tables is installed."""
-    try:
-        import great_tables  # noqa: F401
-    except ImportError:
-        return False
-    else:
-        return True
+HAS_GT = importlib.util.find_spec("great_tables") is not None
+if HAS_GT:
+    from great_tables import GT
 
 
 class TestHighlightPandas:
@@ -29,16 +29,54 @@ class TestHighlightPandas:
         # Should return Styler object
         assert hasattr(result, "to_html"), "Result should be a Styler object"
 
-    def test_highlight_preserves_data(self) -> None:
+    @pytest.mark.parametrize("n", [2, pytest.param(100_000, marks=pytest.mark.slow)])
+    def test_highlight_preserves_data(self, n: int) -> None:
         """Test that highlighting preserves the underlying data."""
-        df = pd.DataFrame({"name": ["Alice", "Bob"], "status": ["active", "locked"]})
+        import numpy as np
+
+        # Names alternate and every third row is active, so n=2 is the
+        # original two-row frame
+        rows = np.arange(n)
+        df = pd.DataFrame(
+            {
+                "name": np.where(rows % 2 == 0, "Alice", "Bob"),
+                "status": np.where(rows % 3 == 0, "active", "locked"),
+            }
+        )
         result = nwgrep(df, "active", highlight=True)
 
         # Get underlying data
         data = result.data
-        assert len(data) == 1
+        assert len(data) == len(range(0, n, 3))
         assert "Alice" in data.values[0]
 
+    def test_highlight_matches_each_column_once(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the row filter reuses the cell masks instead of re-matching."""
+        from pandas.core.strings.accessor import StringMethods
+
+        calls = []
+        contains = StringMethods.contains
+
+        def counting_contains(self: StringMethods, *args: Any, **kwargs: Any) -> Any:
+            calls.append(args)
+            return contains(self, *args, **kwargs)
+
+        monkeypatch.setattr(StringMethods, "contains", counting_contains)
+        df = pd.DataFrame({"name": ["Alice", "Bob"], "status": ["active", "locked"]})
+        nwgrep(df, "active", highlight=True)
+
+        # One match per searched column, shared by the filter and the styling
+        assert len(calls) == 2
+
+    def test_highlight_with_invert(self) -> None:
+        """Test that inverted highlighting keeps only the non-matching rows."""
+        df = pd.DataFrame({"name": ["Alice", "Bob"], "status": ["active", "locked"]})
+        result = nwgrep(df, "active", invert=True, highlight=True)
+
+        assert result.data["name"].tolist() == ["Bob"]
+
     def test_highlight_with_no_matches(self) -> None:
         """Test highlighting with no matches returns empty Styler."""
         df = pd.DataFrame({"col": ["foo", "bar"]})
@@ -65,10 +103,26 @@ class TestHighlightPandas:
         with pytest.raises(ValueError, match="incompatible"):
             nwgrep(df, "foo", count=True, highlight=True)  # type: ignore[no-matching-overload]
 
+    def test_highlight_incompatible_with_count_no_string_columns(self) -> None:
+        """Test that the flags are rejected even when nothing can be searched."""
+        df = pd.DataFrame({"num": [1, 2]})
+
+        with pytest.raises(ValueError, match="incompatible"):
+            nwgrep(df, "foo", count=True, highlight=True)  # type: ignore[no-matching-overload]
+
+    def test_detect_backend_for_subclass(self) -> None:
+        """Test that DataFrame subclasses from other packages map to pandas."""
+        from nwgrep.highlight import _detect_backend
+
+        class SubFrame(pd.DataFrame):
+            pass
+
+        assert _detect_backend(SubFrame({"col": ["foo"]})) == "pandas"
+        assert _detect_backend(object()) == "unsupported"
+
+    @pytest.mark.usefixtures("grep_accessor")
     def test_highlight_with_accessor(self) -> None:
         """Test highlighting via the accessor method."""
-        register_grep_accessor()
-
         df = pd.DataFrame({"col": ["foo", "bar", "baz"]})
         result = df.grep("foo", highlight=True)
 
@@ -79,72 +133,62 @@ class TestHighlightPandas:
 class TestHighlightPolars:
     """Test highlighting with polars backend."""
 
-    @pytest.mark.skipif(not _has_great_tables(), reason="Great Tables not installed")
-    def test_highlight_returns_gt_object(self) -> None:
+    @pytest.mark.skipif(not HAS_GT, reason="Great Tables not installed")
+    def test_highlight_returns_gt_object(self, pl_mod: ModuleType) -> None:
         """Test that highlighting returns a Great Tables object."""
-        df = pl.DataFrame({"col": ["foo", "bar", "baz"]})
+        df = pl_mod.DataFrame({"col": ["foo", "bar", "baz"]})
         result = nwgrep(df, "foo", highlight=True)
 
         # Should return GT object
-        from great_tables import GT
-
         assert isinstance(result, GT)
 
-    @pytest.mark.skipif(not _has_great_tables(), reason="Great Tables not installed")
-    def test_highlight_preserves_data_polars(self) -> None:
+    @pytest.mark.skipif(not HAS_GT, reason="Great Tables not installed")
+    def test_highlight_preserves_data_polars(self, pl_mod: ModuleType) -> None:
         """Test that highlighting preserves the underlying data for polars."""
-        df = pl.DataFrame({"name": ["Alice", "Bob"], "status": ["active", "locked"]})
+        df = pl_mod.DataFrame(
+            {"name": ["Alice", "Bob"], "status": ["active", "locked"]}
+        )
         result = nwgrep(df, "active", highlight=True)
 
-        # Get underlying dataframe
-        from great_tables import GT
-
         assert isinstance(result, GT)
         # GT wraps the dataframe
         data = result._tbl_data
         assert len(data) == 1
 
-    @pytest.mark.skipif(not _has_great_tables(), reason="Great Tables not installed")
-    def test_highlight_with_no_matches_polars(self) -> None:
+    @pytest.mark.skipif(not HAS_GT, reason="Great Tables not installed")
+    def test_highlight_with_no_matches_polars(self, pl_mod: ModuleType) -> None:
         """Test highlighting with no matches for polars."""
-        df = pl.DataFrame({"col": ["foo", "bar"]})
+        df = pl_mod.DataFrame({"col": ["foo", "bar"]})
         result = nwgrep(df, "xyz", highlight=True)
 
-        from great_tables import GT
-
         assert isinstance(result, GT)
         # Empty dataframe
         assert len(result._tbl_data) == 0
 
-    @pytest.mark.skipif(not _has_great_tables(), reason="Great Tables not installed")
-    def test_highlight_with_lazy_frame(self) -> None:
+    @pytest.mark.skipif(not HAS_GT, reason="Great Tables not installed")
+    def test_highlight_with_lazy_frame(self, pl_mod: ModuleType) -> None:
         """Test that highlighting collects LazyFrames."""
-        df = pl.DataFrame({"col": ["foo", "bar", "baz"]}).lazy()
+        df = pl_mod.DataFrame({"col": ["foo", "bar", "baz"]}).lazy()
         result = nwgrep(df, "foo", highlight=True)
 
-        from great_tables import GT
-
         assert isinstance(result, GT)
         assert len(result._tbl_data) == 1
 
-    @pytest.mark.skipif(not _has_great_tables(), reason="Great Tables not installed")
-    def test_highlight_incompatible_with_count_polars(self) -> None:
+    @pytest.mark.skipif(not HAS_GT, reason="Great Tables not installed")
+    def test_highlight_incompatible_with_count_polars(self, pl_mod: ModuleType) -> None:
         """Test that highlight and count are incompatible for polars."""
-        df = pl.DataFrame({"col": ["foo", "bar"]})
+        df = pl_mod.DataFrame({"col": ["foo", "bar"]})
 
         with pytest.raises(ValueError, match="incompatible"):
             nwgrep(df, "foo", count=True, highlight=True)  # type: ignore[no-matching-overload]
 
-    @pytest.mark.skipif(not _has_great_tables(), reason="Great Tables not installed")
-    def test_highlight_with_accessor_polars(self) -> None:
+    @pytest.mark.skipif(not HAS_GT, reason="Great Tables not installed")
+    @pytest.mark.usefixtures("grep_accessor")
+    def test_highlight_with_accessor_polars(self, pl_mod: ModuleType) -> None:
         """Test highlighting via the accessor method for polars."""
-        register_grep_accessor()
-
-        df = pl.DataFrame({"col": ["foo", "bar", "baz"]})
+        df = pl_mod.DataFrame({"col": ["foo", "bar", "baz"]})
         result = df.grep("foo", highlight=True)
 
-        from great_tables import GT
-
         assert isinstance(result, GT)
 
 